@@ -1,6 +1,7 @@
 import os
 import re
 import json
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 
 
@@ -31,6 +32,44 @@ summary_tmpl = """\
 ```
 """
 
+market_tmpl = """\
+分析以下财经新闻，给出:
+
+1. 当日消息面整体情况，包括利好和利空消息，以及对相关行业和板块的影响
+2. 当日的政策面分析，有哪些重大的方向和板块需要关注，哪些行业/板块会受政策影响进行调整
+3. 对第二天行情的预测，看涨哪些板块，看跌哪些板块，哪些龙头股值得关注，哪些风险需要重点关注
+
+新闻内容:
+{news_content}
+
+最后按照json的格式返回：
+```json
+{{
+    "news_impact": "...",  // 消息面整体情况
+    "policy_impact": "...",  // 政策面分析
+    "market_prediction": "..."  // 对第二天行情的预测
+}}
+```
+"""
+
+company_tmpl = """\
+根据以下与{company}相关的财经新闻，对{company}的走势进行预测：
+   - 明天走势预测
+   - 短期（1-2周）走势预测
+   - 长期（1-3个月）走势预测
+
+新闻内容:
+{news_content}
+
+最后按照json的格式返回：
+```json
+{{
+    "company": "{company}",
+    "report": "..."  // 走势预测
+}}
+```
+"""
+
 
 class DeepseekAI:
     def __init__(self, api_key=None, model="deepseek-r1"):
@@ -101,6 +140,62 @@ class DeepseekAI:
             "parsed_data": parsed_json
         }
     
+    def analyze_news_parallel(self, news_content, company_news, max_workers=4):
+        """
+        Analyze financial news with one market-level call and one short call per
+        company, running concurrently on a bounded thread pool
+
+        Args:
+            news_content (str): News content for the market-level analysis
+            company_news (dict): Mapping of company name to its relevant news content,
+                companies with empty content are reported without a model call
+            max_workers (int): Maximum number of concurrent model calls
+
+        Returns:
+            dict: Analysis results in the same shape as analyze_news
+        """
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            market_future = executor.submit(self.generate, market_tmpl.format(news_content=news_content))
+            # 没有相关新闻的企业不调用模型，避免凭空预测并占用并发名额
+            company_futures = {
+                company: executor.submit(self.generate, company_tmpl.format(company=company, news_content=content))
+                if content else None
+                for company, content in company_news.items()
+            }
+
+            market_result = market_future.result()
+            parsed_json = self.parse_json_response(market_result["content"]) or {}
+            reasoning = [market_result["reasoning"] or '']
+            analysis = [market_result["content"] or '']
+
+            company_predictions = []
+            for company, future in company_futures.items():
+                if future is None:
+                    company_predictions.append({"company": company, "report": "无相关新闻，未进行预测"})
+                    continue
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 单个企业失败不影响整体报告
+                    company_predictions.append({"company": company, "report": f"分析失败: {str(e)}"})
+                    continue
+
+                parsed = self.parse_json_response(result["content"]) or {}
+                company_predictions.append({
+                    "company": company,
+                    "report": parsed.get("report") or result["content"]
+                })
+                reasoning.append(f"【{company}】\n{result['reasoning'] or ''}")
+                analysis.append(f"【{company}】\n{result['content'] or ''}")
+
+        parsed_json["company_predictions"] = company_predictions
+
+        return {
+            "reasoning": "\n\n".join(reasoning),
+            "analysis": "\n\n".join(analysis),
+            "parsed_data": parsed_json
+        }
+
     @staticmethod
     def parse_json_response(response_text):
         """
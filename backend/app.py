@@ -1,12 +1,13 @@
 import os
 import json
+import time
+import sqlite3
 import logging
-import asyncio
 import aiohttp
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from pytz import timezone
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, redirect, Response, stream_with_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -14,6 +15,13 @@ from sqlalchemy import text, JSON
 from flask_compress import Compress  # 添加压缩支持
 
 from ai_service import DeepseekAI
+from compression import DEFAULT_CODEC, compress_text, decompress_text
+from company_matcher import CompanyMatcher, load_company_aliases, alias_fingerprint
+from news_store import NewsRecord, RecentNewsStore, summary_preview
+from news_stream import NewsBroadcaster
+from news_export import EXPORT_FORMATS, parse_export_time, encode_rows, gzip_chunks
+from crawl_coordinator import CrawlCoordinator
+from prompt_builder import render_fragment, render_fragments, fragment_fingerprint, assemble_news_content
 
 
 app = Flask(__name__)
@@ -23,7 +31,7 @@ Compress(app)  # 启用压缩
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 # 数据库配置
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///finance_news.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///finance_news.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
     'pool_pre_ping': True,
@@ -31,6 +39,15 @@ app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
     'pool_size': 10,
     'max_overflow': 20
 }
+# 内存中的近期新闻窗口配置
+app.config['RECENT_NEWS_HOURS'] = 24 * 5  # 与新闻保留时间一致
+app.config['RECENT_NEWS_MAX_ITEMS'] = 20000  # 最多缓存的文章数
+app.config['RECENT_NEWS_SYNC_SECONDS'] = 30  # 补充其他进程写入的新闻的最短间隔
+# 并行分析时同时调用模型的上限
+app.config['ANALYSIS_MAX_WORKERS'] = 8
+# 新闻实时推送（SSE）服务地址，默认只监听本机，与 app.run 一致
+app.config['NEWS_STREAM_HOST'] = os.environ.get('NEWS_STREAM_HOST', '127.0.0.1')
+app.config['NEWS_STREAM_PORT'] = int(os.environ.get('NEWS_STREAM_PORT', 5001))
 db = SQLAlchemy(app)
 
 # 定义财经资讯模型
@@ -42,13 +59,104 @@ class FinanceNews(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)  # 入库时间
     pub_time = db.Column(db.String(50), nullable=False)  # 文章发布时间
     article_type = db.Column(db.String(20), nullable=False)  # 文章类型
-    summary = db.Column(db.Text, nullable=True)  # 文章摘要
-    content = db.Column(db.Text, nullable=True)  # 文章正文
+    summary_preview = db.Column(db.Text, nullable=True)  # 列表展示用的摘要预览，完整摘要和正文压缩存放在 news_body
     url = db.Column(db.String(200), nullable=False)  # 新增字段：文章 URL
+    companies = db.relationship('NewsCompany', backref='news', cascade='all, delete-orphan', lazy=True)  # 提及的企业
+    body = db.relationship('NewsBody', backref='news', uselist=False, cascade='all, delete-orphan', lazy='select')  # 按需加载
+    fragments = db.relationship('NewsFragment', backref='news', cascade='all, delete-orphan', lazy=True)  # 预渲染的提示词片段
+
+    @property
+    def summary(self):
+        """文章摘要，访问时才加载并解压"""
+        return self.body.summary_text if self.body else None
+
+    @summary.setter
+    def summary(self, value):
+        if self.body is None:
+            self.body = NewsBody()
+        self.body.summary_text = value
+        self.summary_preview = summary_preview(value)
+
+    @property
+    def content(self):
+        """文章正文，访问时才加载并解压"""
+        return self.body.content_text if self.body else None
+
+    @content.setter
+    def content(self, value):
+        if self.body is None:
+            self.body = NewsBody()
+        self.body.content_text = value
 
     def __repr__(self):
         return f'<FinanceNews {self.title}>'
 
+# 定义文章正文模型，摘要和正文压缩后单独存放，避免主表行过大
+class NewsBody(db.Model):
+    article_id = db.Column(db.String(50), db.ForeignKey('finance_news.article_id'), primary_key=True)
+    codec = db.Column(db.String(10), nullable=False, default=DEFAULT_CODEC)  # 压缩格式
+    summary = db.Column(db.LargeBinary, nullable=True)  # 压缩后的文章摘要
+    content = db.Column(db.LargeBinary, nullable=True)  # 压缩后的文章正文
+
+    @property
+    def summary_text(self):
+        return decompress_text(self.summary, self.codec or DEFAULT_CODEC)
+
+    @summary_text.setter
+    def summary_text(self, value):
+        self.codec = DEFAULT_CODEC
+        self.summary = compress_text(value)
+
+    @property
+    def content_text(self):
+        return decompress_text(self.content, self.codec or DEFAULT_CODEC)
+
+    @content_text.setter
+    def content_text(self, value):
+        self.codec = DEFAULT_CODEC
+        self.content = compress_text(value)
+
+    def __repr__(self):
+        return f'<NewsBody {self.article_id}>'
+
+# 定义企业提及索引模型
+class NewsCompany(db.Model):
+    __table_args__ = (db.UniqueConstraint('article_id', 'company'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    article_id = db.Column(db.String(50), db.ForeignKey('finance_news.article_id'), nullable=False, index=True)
+    company = db.Column(db.String(100), nullable=False, index=True)  # 标准企业名称
+    hits = db.Column(db.Integer, nullable=False, default=1)  # 命中次数
+
+    def __repr__(self):
+        return f'<NewsCompany {self.company} - {self.article_id}>'
+
+# 定义提示词片段模型，入库时按常用摘要长度预先渲染
+class NewsFragment(db.Model):
+    article_id = db.Column(db.String(50), db.ForeignKey('finance_news.article_id'), primary_key=True)
+    summary_limit = db.Column(db.Integer, primary_key=True)  # 摘要长度限制
+    fragment = db.Column(db.Text, nullable=False)  # 渲染后的新闻片段
+
+    def __repr__(self):
+        return f'<NewsFragment {self.article_id} - {self.summary_limit}>'
+
+# 定义系统元数据模型，记录索引对应的词典版本等信息
+class AppMeta(db.Model):
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Text, nullable=True)
+
+    @classmethod
+    def get_value(cls, key):
+        meta = db.session.get(cls, key)
+        return meta.value if meta else None
+
+    @classmethod
+    def set_value(cls, key, value):
+        db.session.merge(cls(key=key, value=value))
+
+    def __repr__(self):
+        return f'<AppMeta {self.key}>'
+
 # 定义分析报告模型
 class AnalysisReport(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -80,7 +188,7 @@ def update_database_schema():
     try:
         with db.engine.connect() as conn:
             # 获取所有模型类
-            models = [FinanceNews, AnalysisReport]
+            models = [FinanceNews, AnalysisReport, NewsCompany, NewsBody, NewsFragment, AppMeta]
             
             for model in models:
                 # 获取表名
@@ -124,12 +232,221 @@ def update_database_schema():
                     app.logger.info(f"执行 SQL: {sql}")
                     conn.execute(text(sql))
                     conn.commit()
+            
+            # 将旧版内联存储的摘要和正文迁移到 news_body
+            migrate_inline_news_bodies(conn)
                     
         app.logger.info("数据库表结构更新完成")
     except Exception as e:
         app.logger.error(f"更新数据库表结构时出错: {e}")
         raise e
 
+def migrate_inline_news_bodies(conn, batch_size=500):
+    """
+    把 finance_news 中旧的 summary/content 列压缩迁移到 news_body，然后删除旧列
+
+    SQLite 3.35 之前不支持 DROP COLUMN，此时保留旧列并清空已迁移的值，
+    之后启动时只会处理仍有内容的行
+    """
+    result = conn.execute(text("PRAGMA table_info(finance_news)"))
+    legacy_columns = [row[1] for row in result if row[1] in ('summary', 'content')]
+    if not legacy_columns:
+        return
+
+    summary_column = 'summary' if 'summary' in legacy_columns else 'NULL'
+    content_column = 'content' if 'content' in legacy_columns else 'NULL'
+    can_drop = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+    migrated = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            f"SELECT id, article_id, {summary_column}, {content_column} FROM finance_news "
+            f"WHERE id > :last_id AND ({summary_column} IS NOT NULL OR {content_column} IS NOT NULL) "
+            f"ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": batch_size}).fetchall()
+        if not rows:
+            break
+
+        conn.execute(text(
+            "INSERT OR REPLACE INTO news_body (article_id, codec, summary, content) "
+            "VALUES (:article_id, :codec, :summary, :content)"
+        ), [
+            {
+                "article_id": article_id,
+                "codec": DEFAULT_CODEC,
+                "summary": compress_text(summary),
+                "content": compress_text(content),
+            }
+            for _, article_id, summary, content in rows
+        ])
+        assignments = ', '.join(f"{column_name} = NULL" for column_name in legacy_columns)
+        conn.execute(text(
+            f"UPDATE finance_news SET summary_preview = :preview, {assignments} WHERE id = :id"
+        ), [{"id": news_id, "preview": summary_preview(summary)} for news_id, _, summary, _ in rows])
+        conn.commit()
+
+        migrated += len(rows)
+        last_id = rows[-1][0]
+
+    if can_drop:
+        for column_name in legacy_columns:
+            conn.execute(text(f"ALTER TABLE finance_news DROP COLUMN {column_name}"))
+        conn.commit()
+    elif not migrated:
+        return
+    else:
+        app.logger.warning(f"SQLite {sqlite3.sqlite_version} 不支持删除列，旧列 {legacy_columns} 已清空并保留")
+    # 回收旧列占用的空间
+    conn.execute(text("VACUUM"))
+    app.logger.info(f"已迁移 {migrated} 篇文章的正文到 news_body")
+
+# 企业词典匹配器，入库时为每篇文章建立企业提及索引
+company_aliases = load_company_aliases()
+company_matcher = CompanyMatcher(company_aliases)
+
+def index_news_companies(news_item):
+    """对单篇文章运行一次企业匹配，并写入 news_company 索引"""
+    text_parts = [news_item.title, news_item.summary, news_item.content]
+    hits = company_matcher.match('\n'.join(part for part in text_parts if part))
+    news_item.companies = [
+        NewsCompany(article_id=news_item.article_id, company=company, hits=count)
+        for company, count in hits.items()
+    ]
+    return hits
+
+def iter_news_batches(*options, batch_size=500):
+    """按 id 分批加载全部文章，每批处理完后提交并清空会话，避免一次加载整张表"""
+    last_id = 0
+    while True:
+        news_items = FinanceNews.query.options(*options) \
+            .filter(FinanceNews.id > last_id).order_by(FinanceNews.id).limit(batch_size).all()
+        if not news_items:
+            return
+        yield news_items
+        db.session.commit()
+        last_id = news_items[-1].id
+        db.session.expunge_all()
+
+def rebuild_company_index():
+    """企业词典变更（如修改 COMPANY_ALIASES_FILE）后，为所有文章重建企业提及索引"""
+    fingerprint = alias_fingerprint(company_aliases)
+    if AppMeta.get_value('company_aliases_fingerprint') == fingerprint:
+        return 0
+
+    # 先整体清空旧索引，避免与重新写入的 (article_id, company) 唯一约束冲突
+    NewsCompany.query.delete(synchronize_session=False)
+    db.session.commit()
+
+    indexed = 0
+    # 预先加载 companies，避免替换集合时逐篇触发懒加载
+    for news_items in iter_news_batches(db.joinedload(FinanceNews.body), db.selectinload(FinanceNews.companies)):
+        for news in news_items:
+            index_news_companies(news)
+        indexed += len(news_items)
+
+    # 全部完成后才记录词典指纹，中途中断时下次启动会重新建立
+    AppMeta.set_value('company_aliases_fingerprint', fingerprint)
+    db.session.commit()
+    app.logger.info(f"企业词典已变更，已为 {indexed} 篇文章重建企业索引")
+    return indexed
+
+def render_news_fragments(news_item):
+    """按常用摘要长度预渲染文章的提示词片段，并写入 news_fragment"""
+    fragments = render_fragments(news_item.title, news_item.pub_time, news_item.article_type, news_item.summary)
+    news_item.fragments = [
+        NewsFragment(article_id=news_item.article_id, summary_limit=limit, fragment=fragment)
+        for limit, fragment in fragments.items()
+    ]
+    return fragments
+
+def rebuild_prompt_fragments():
+    """片段格式或 COMMON_SUMMARY_LIMITS 变更后，为所有文章重新生成提示词片段"""
+    fingerprint = fragment_fingerprint()
+    if AppMeta.get_value('prompt_fragments_fingerprint') == fingerprint:
+        return 0
+
+    NewsFragment.query.delete(synchronize_session=False)
+    db.session.commit()
+
+    rendered = 0
+    for news_items in iter_news_batches(db.joinedload(FinanceNews.body), db.selectinload(FinanceNews.fragments)):
+        for news in news_items:
+            render_news_fragments(news)
+        rendered += len(news_items)
+
+    AppMeta.set_value('prompt_fragments_fingerprint', fingerprint)
+    db.session.commit()
+    app.logger.info(f"提示词片段格式已变更，已为 {rendered} 篇文章重新生成片段")
+    return rendered
+
+# 进程内的近期新闻窗口，热点接口和提示词构建优先从这里读取
+recent_news_store = RecentNewsStore(
+    hours=app.config['RECENT_NEWS_HOURS'],
+    max_items=app.config['RECENT_NEWS_MAX_ITEMS']
+)
+# 上次从数据库补充新闻的时间
+last_news_sync = 0.0
+
+def load_news_records(*criteria):
+    """按列投影查询新闻及其提及的企业，直接构建紧凑记录而不创建 ORM 对象"""
+    rows = db.session.query(
+        FinanceNews.id, FinanceNews.article_id, FinanceNews.title, FinanceNews.pub_time,
+        FinanceNews.created_at, FinanceNews.article_type, NewsBody.codec, NewsBody.summary, FinanceNews.url
+    ).outerjoin(NewsBody).filter(*criteria).all()
+
+    company_names = {}
+    mentions = db.session.query(NewsCompany.article_id, NewsCompany.company).join(FinanceNews).filter(*criteria)
+    for article_id, company in mentions:
+        company_names.setdefault(article_id, []).append(company)
+
+    prompt_fragments = {}
+    fragments = db.session.query(
+        NewsFragment.article_id, NewsFragment.summary_limit, NewsFragment.fragment
+    ).join(FinanceNews).filter(*criteria)
+    for article_id, summary_limit, fragment in fragments:
+        prompt_fragments.setdefault(article_id, {})[summary_limit] = fragment
+
+    return [
+        NewsRecord(
+            news_id, article_id, title, pub_time, created_at, article_type,
+            decompress_text(summary, codec or DEFAULT_CODEC), url,
+            company_names=company_names.get(article_id, ()),
+            prompt_fragments=prompt_fragments.get(article_id)
+        )
+        for news_id, article_id, title, pub_time, created_at, article_type, codec, summary, url in rows
+    ]
+
+def warm_recent_news_store():
+    """从数据库加载最近 N 小时的新闻到内存窗口"""
+    global last_news_sync
+    last_news_sync = time.monotonic()
+    cutoff = datetime.utcnow() - timedelta(hours=recent_news_store.hours)
+    records = load_news_records(FinanceNews.created_at >= cutoff)
+    # 数据库中没有更早的文章时，内存窗口即为全量数据
+    has_older = FinanceNews.query.filter(FinanceNews.created_at < cutoff).first() is not None
+    recent_news_store.load(records, complete_from=cutoff if has_older else None)
+    app.logger.info(f"近期新闻窗口已加载: {recent_news_store.stats()}")
+
+def sync_recent_news_store():
+    """
+    补充其他进程写入、尚未进入本进程窗口的新闻
+
+    本进程的抓取会直接更新窗口，这里只用于发现其他 worker 的写入，
+    因此最多每 RECENT_NEWS_SYNC_SECONDS 秒查询一次数据库
+    """
+    global last_news_sync
+    if not recent_news_store.warmed:
+        warm_recent_news_store()
+        return
+    now = time.monotonic()
+    if now - last_news_sync < app.config['RECENT_NEWS_SYNC_SECONDS']:
+        return
+    last_news_sync = now
+    records = load_news_records(FinanceNews.id > recent_news_store.last_id)
+    if records:
+        recent_news_store.add(records)
+
 # 创建数据库
 with app.app_context():
     try:
@@ -137,10 +454,129 @@ with app.app_context():
         db.create_all()
         # 更新表结构，添加缺失的字段
         update_database_schema()
+        # 企业词典变更时重建企业提及索引
+        rebuild_company_index()
+        # 片段格式变更时重新生成提示词片段
+        rebuild_prompt_fragments()
+        # 预热近期新闻窗口
+        warm_recent_news_store()
     except Exception as e:
         app.logger.error(f"数据库初始化出错: {e}")
         raise e
 
+def select_news_for_analysis(time_ago, max_news, focused_companies):
+    """
+    选择用于分析的新闻：优先保留通过索引查到的、提及关注企业的文章，
+    剩余名额按发布时间由新到旧补齐
+    """
+    sync_recent_news_store()
+    if recent_news_store.covers(time_ago):
+        records = recent_news_store.since(time_ago)
+    else:
+        # 内存窗口不完整时，按列投影从数据库读取
+        records = sorted(
+            load_news_records(FinanceNews.created_at >= time_ago),
+            key=lambda record: record.pub_key,
+            reverse=True
+        )
+
+    relevant_news = []
+    if focused_companies:
+        known = {company_matcher.canonical(name) for name in focused_companies} - {None}
+        unknown = [name for name in focused_companies if company_matcher.canonical(name) is None]
+        adhoc_matcher = None
+        if unknown:
+            # 词典外的企业无法走索引，对窗口内文章临时扫描一次
+            app.logger.info(f"企业不在词典中，回退为文本匹配: {unknown}")
+            adhoc_matcher = CompanyMatcher({name: [name] for name in unknown})
+        for record in records:
+            if known.intersection(record.company_names) or (
+                adhoc_matcher and adhoc_matcher.match(f"{record.title}\n{record.summary or ''}")
+            ):
+                relevant_news.append(record)
+        relevant_news = relevant_news[:max_news]
+
+    selected_ids = {record.id for record in relevant_news}
+    other_news = [record for record in records if record.id not in selected_ids][:max_news - len(relevant_news)]
+
+    return sorted(relevant_news + other_news, key=lambda news: news.pub_time, reverse=True), len(relevant_news)
+
+def group_news_by_company(news_items, focused_companies):
+    """按关注企业对新闻分组，词典内的企业通过索引查找，保持原有顺序"""
+    canonical_names = {name: company_matcher.canonical(name) for name in focused_companies}
+
+    unknown = [name for name, company in canonical_names.items() if company is None]
+    adhoc_matcher = CompanyMatcher({name: [name] for name in unknown}) if unknown else None
+
+    grouped = {name: [] for name in canonical_names}
+    for news in news_items:
+        adhoc_hits = adhoc_matcher.match(f"{news.title}\n{news.summary or ''}") if adhoc_matcher else {}
+        for name, company in canonical_names.items():
+            if (company and company in news.company_names) or name in adhoc_hits:
+                grouped[name].append(news)
+    return grouped
+
+def build_news_content(news_items, summary_limit):
+    """
+    使用预渲染的片段拼接新闻内容供分析，没有对应长度的片段时即时渲染
+
+    Returns:
+        tuple: (news_content, stats)，stats 包含条数、字符数和估算的 token 数
+    """
+    fragments = (
+        news.prompt_fragments.get(summary_limit)
+        or render_fragment(news.title, news.pub_time, news.article_type, news.summary, summary_limit)
+        for news in news_items
+    )
+    news_content, stats = assemble_news_content(fragments)
+    stats["candidates"] = len(news_items)
+
+    # 检查输入长度
+    if stats["truncated"]:
+        app.logger.warning(f"新闻内容太长，已截断为 {stats['characters']} 字符（{stats['items']}/{len(news_items)} 条）")
+    return news_content, stats
+
+def analyze_selected_news(limited_news, focused_companies, summary_limit, mode='single', max_workers=4):
+    """
+    调用 AI 分析选中的新闻
+
+    mode 为 'single' 时使用单次调用完成全部分析；为 'parallel' 时并发执行
+    市场分析和每个企业的独立预测，每个企业只使用与其相关的新闻
+    """
+    news_content, prompt_stats = build_news_content(limited_news, summary_limit)
+    app.logger.info(f"提示词拼接: {prompt_stats}")
+    ai_service = DeepseekAI()
+
+    if mode == 'parallel' and focused_companies:
+        company_news = {}
+        prompt_stats["companies"] = {}
+        for company, items in group_news_by_company(limited_news, focused_companies).items():
+            company_news[company], prompt_stats["companies"][company] = build_news_content(items, summary_limit)
+        # 并发数不超过实际调用数和全局上限，避免单个请求发起过多模型调用
+        max_workers = max(1, min(max_workers, len(company_news) + 1, app.config['ANALYSIS_MAX_WORKERS']))
+        app.logger.info(f"并行分析: 市场分析 + {len(company_news)} 家企业, 并发数 {max_workers}")
+        analysis_result = ai_service.analyze_news_parallel(news_content, company_news, max_workers=max_workers)
+    else:
+        analysis_result = ai_service.analyze_news(news_content, focused_companies)
+
+    analysis_result["prompt_stats"] = prompt_stats
+    return analysis_result
+
+# 新闻实时推送，抓取和删除提交后向所有连接广播
+news_broadcaster = NewsBroadcaster()
+
+def serialize_news(news):
+    """只返回前端需要的字段，并限制摘要长度"""
+    return {
+        'title': news.title,
+        'article_id': news.article_id,
+        'created_at': news.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        'pub_time': news.pub_time,
+        'article_type': news.article_type,
+        'summary': news.summary_preview,  # 限制摘要长度
+        'url': news.url
+    }
+
 # 定义删除旧内容的任务
 def delete_old_news():
     five_days_ago = datetime.utcnow() - timedelta(days=5)
@@ -148,10 +584,13 @@ def delete_old_news():
     for news in old_news:
         db.session.delete(news)
     db.session.commit()
+    recent_news_store.trim(five_days_ago)  # 同步裁剪内存窗口
+    if old_news:
+        news_broadcaster.publish('delete', {'article_ids': [news.article_id for news in old_news]})
     app.logger.info(f"Deleted {len(old_news)} old news articles.")
 
 # 定义抓取新闻的任务
-async def fetch_news_task():
+async def fetch_news_task(progress=None):
     try:
         with app.app_context():
             # 抓取主新闻
@@ -206,11 +645,14 @@ async def fetch_news_task():
 
                 # 处理抓取到的文章
                 count = 0
+                new_items = []  # 本次新增的文章及其企业命中，提交后写入内存窗口
                 total_articles = len(articles)
                 beijing_tz = timezone('Asia/Shanghai')
                 current_time = datetime.now(beijing_tz)
 
-                for article in articles:
+                for index, article in enumerate(articles):
+                    if progress:
+                        progress(index, total_articles)  # 汇报已处理的文章数
                     if 'detail/' in article['href']:
                         title = article.get_text()  # 从 BeautifulSoup 对象中获取标题
                         link = article['href']
@@ -290,7 +732,10 @@ async def fetch_news_task():
                                 content=content_text,
                                 url=url  # 存储 URL
                             )
+                            hits = index_news_companies(news_item)  # 建立企业提及索引
+                            fragments = render_news_fragments(news_item)  # 预渲染提示词片段
                             db.session.add(news_item)
+                            new_items.append((news_item, hits, fragments))
                             count += 1
                         except Exception as e:
                             app.logger.error(f"Error inserting article {article_id}: {e}")
@@ -300,6 +745,20 @@ async def fetch_news_task():
                         app.logger.info(f"抓取进度: {fetch_progress:.2f}%")
 
                 db.session.commit()
+                if progress:
+                    progress(total_articles, total_articles)
+                new_records = [
+                    NewsRecord(
+                        news.id, news.article_id, news.title, news.pub_time, news.created_at,
+                        news.article_type, news.summary, news.url,
+                        company_names=hits, prompt_fragments=fragments
+                    )
+                    for news, hits, fragments in new_items
+                ]
+                recent_news_store.add(new_records)
+                # 推送新文章给实时订阅的客户端
+                for record in new_records:
+                    news_broadcaster.publish('news', serialize_news(record))
                 return {"message": f"财经资讯已抓取并存储到数据库！共抓取到 {count} 条文章。"}, 200
     except Exception as e:
         app.logger.error(f"抓取新闻时出错: {e}")
@@ -308,9 +767,15 @@ async def fetch_news_task():
 # 设置调度器
 scheduler = BackgroundScheduler()
 
-# 使用 asyncio.run() 来调用异步任务
+# 抓取协调器：所有抓取都在同一个事件循环线程中执行，同一时间只有一次抓取
+crawl_coordinator = CrawlCoordinator(fetch_news_task)
+
 def run_fetch_news_task():
-    asyncio.run(fetch_news_task())
+    # 如果已有抓取在进行，直接等待它完成
+    run, started = crawl_coordinator.trigger(source='scheduler')
+    if not started:
+        app.logger.info(f"已有抓取任务在进行，定时任务等待其结果: {run.id}")
+    run.wait()
 
 # 自动生成报告的定时任务
 def auto_generate_report():
@@ -322,42 +787,27 @@ def auto_generate_report():
             max_news = 300  # 默认最多300条新闻
             summary_limit = 100  # 默认摘要100字
             focused_companies = ['腾讯', '小米集团', '中芯国际', '特斯拉', '药明康德', '阿里巴巴']  # 默认关注企业列表
+            analysis_mode = 'parallel'  # 按企业并行分析
+            max_workers = 4  # 最大并发调用数
             
             # 计算指定时间前
             time_ago = datetime.utcnow() - timedelta(hours=hours)
             
-            # 获取指定时间范围内的新闻，按发布时间倒序排列
-            news_items = FinanceNews.query.filter(FinanceNews.created_at >= time_ago).order_by(FinanceNews.pub_time.desc()).all()
+            # 获取指定时间范围内的新闻，优先选择提及关注企业的文章
+            limited_news, relevant_count = select_news_for_analysis(time_ago, max_news, focused_companies)
             
-            if not news_items:
+            if not limited_news:
                 app.logger.warning("没有找到最近12小时的新闻")
                 return
             
-            # 限制新闻数量
-            limited_news = news_items[:max_news]
-            app.logger.info(f"分析新闻: 最近{hours}小时内, 限制为最近{max_news}条, 实际选择{len(limited_news)}条")
-            
-            # 格式化新闻内容供分析
-            news_content = ""
-            for news in limited_news:
-                news_content += f"标题: {news.title}\n"
-                news_content += f"时间: {news.pub_time}\n"
-                news_content += f"类型: {news.article_type}\n"
-                if news.summary:
-                    # 限制摘要长度
-                    summary = news.summary[:summary_limit] + "..." if len(news.summary) > summary_limit else news.summary
-                    news_content += f"摘要: {summary}\n"
-                news_content += "\n---\n\n"
-            
-            # 检查输入长度
-            if len(news_content) > 30000:  # 根据模型限制调整此值
-                app.logger.warning(f"新闻内容太长: {len(news_content)} 字符，将被截断")
-                news_content = news_content[:30000] + "...\n[内容已截断]"
+            app.logger.info(f"分析新闻: 最近{hours}小时内, 限制为最近{max_news}条, 实际选择{len(limited_news)}条, 其中提及关注企业{relevant_count}条")
             
             # 初始化AI服务并分析新闻
-            ai_service = DeepseekAI()
             try:
-                analysis_result = ai_service.analyze_news(news_content, focused_companies)
+                analysis_result = analyze_selected_news(
+                    limited_news, focused_companies, summary_limit,
+                    mode=analysis_mode, max_workers=max_workers
+                )
             except Exception as e:
                 app.logger.error(f"AI分析失败: {str(e)}")
                 raise
@@ -417,58 +867,142 @@ scheduler.add_job(auto_generate_report, 'cron', hour=20, minute=0)  # 每天晚
 
 scheduler.start()
 
+@app.before_request
+def start_news_stream():
+    # 在首个请求时启动推送服务，避免调试模式的重载进程重复占用端口
+    news_broadcaster.start(host=app.config['NEWS_STREAM_HOST'], port=app.config['NEWS_STREAM_PORT'])
+
 @app.route('/')
 def index():
     return "欢迎来到财经资讯网站！"
 
+# /news 允许的排序字段，摘要按主表中的预览排序
+NEWS_SORT_COLUMNS = {
+    'id': FinanceNews.id,
+    'title': FinanceNews.title,
+    'article_id': FinanceNews.article_id,
+    'created_at': FinanceNews.created_at,
+    'pub_time': FinanceNews.pub_time,
+    'article_type': FinanceNews.article_type,
+    'summary': FinanceNews.summary_preview,
+    'url': FinanceNews.url,
+}
+
 @app.route('/news')
 def get_news():
     sort_by = request.args.get('sort_by', 'pub_time')  # 默认按发布时间排序
     order = request.args.get('order', 'desc')  # 默认降序
     keyword = request.args.get('keyword', '')  # 获取关键词参数
+    if sort_by not in NEWS_SORT_COLUMNS:
+        return {"error": f"不支持的排序字段: {sort_by}"}, 400
 
-    # 根据排序参数构建查询
-    query = FinanceNews.query
-    
-    # 如果有关键词，添加标题搜索条件
-    if keyword:
-        query = query.filter(FinanceNews.title.like(f'%{keyword}%'))
-    
-    # 按排序条件排序
-    if order == 'asc':
-        news_items = query.order_by(getattr(FinanceNews, sort_by).asc()).all()
+    sync_recent_news_store()
+    if sort_by == 'pub_time' and recent_news_store.covers():
+        # 内存窗口覆盖全部文章时，直接从内存读取
+        news_items = recent_news_store.latest()
+        if keyword:
+            news_items = [news for news in news_items if keyword.lower() in news.title.lower()]
+        if order == 'asc':
+            news_items.reverse()
     else:
-        news_items = query.order_by(getattr(FinanceNews, sort_by).desc()).all()
+        # 根据排序参数构建查询
+        query = FinanceNews.query
+        
+        # 如果有关键词，添加标题搜索条件
+        if keyword:
+            query = query.filter(FinanceNews.title.like(f'%{keyword}%'))
+        
+        # 按排序条件排序
+        sort_column = NEWS_SORT_COLUMNS[sort_by]
+        if order == 'asc':
+            news_items = query.order_by(sort_column.asc()).all()
+        else:
+            news_items = query.order_by(sort_column.desc()).all()
 
     # 只返回前端需要的字段，并限制摘要长度
-    news_list = [
-        {
-            'title': news.title,
-            'article_id': news.article_id,
-            'created_at': news.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-            'pub_time': news.pub_time,
-            'article_type': news.article_type,
-            'summary': news.summary[:200] + '...' if news.summary and len(news.summary) > 200 else news.summary,  # 限制摘要长度
-            'url': news.url
-        } for news in news_items
-    ]
+    news_list = [serialize_news(news) for news in news_items]
     
     # 添加缓存控制头
     response = jsonify({'news': news_list})
     response.headers['Cache-Control'] = 'public, max-age=300'  # 缓存5分钟
     return response
 
+@app.route('/news/stream', methods=['GET'])
+def news_stream():
+    # SSE 连接由独立的事件循环服务承载，这里重定向过去，保留续传参数
+    host = request.host.split(':')[0]
+    stream_url = f"{request.scheme}://{host}:{app.config['NEWS_STREAM_PORT']}/news/stream"
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if last_event_id:
+        stream_url += f"?last_event_id={last_event_id}"
+    return redirect(stream_url, code=307)
+
+@app.route('/news/<article_id>', methods=['GET'])
+def get_news_detail(article_id):
+    try:
+        news = FinanceNews.query.filter_by(article_id=article_id).first()
+        if not news:
+            return {"error": "文章未找到"}, 404
+
+        # 详情页才加载并解压完整的摘要和正文
+        news_data = serialize_news(news)
+        news_data['summary'] = news.summary
+        news_data['content'] = news.content
+        return jsonify(news_data), 200
+    except Exception as e:
+        app.logger.error(f"获取文章详情时出错: {e}")
+        return {"error": f"获取文章详情时出错: {str(e)}"}, 500
+
+@app.route('/news/store_stats', methods=['GET'])
+def get_news_store_stats():
+    return recent_news_store.stats(), 200
+
+@app.route('/companies/<name>/news', methods=['GET'])
+def get_company_news(name):
+    try:
+        company = company_matcher.canonical(name)
+        if not company:
+            return {"error": f"企业不在词典中: {name}"}, 404
+
+        # 可选的时间范围（小时）和数量限制
+        hours = request.args.get('hours', type=int)
+        limit = request.args.get('limit', type=int, default=100)
+
+        query = FinanceNews.query.join(NewsCompany).filter(NewsCompany.company == company)
+        if hours:
+            query = query.filter(FinanceNews.created_at >= datetime.utcnow() - timedelta(hours=hours))
+        news_items = query.order_by(FinanceNews.pub_time.desc()).limit(limit).all()
+
+        news_list = [serialize_news(news) for news in news_items]
+        return jsonify({'company': company, 'news': news_list}), 200
+    except Exception as e:
+        app.logger.error(f"获取企业相关新闻时出错: {e}")
+        return {"error": f"获取企业相关新闻时出错: {str(e)}"}, 500
+
 @app.route('/fetch_news', methods=['GET'])
 def fetch_news():
     try:
-        result = asyncio.run(fetch_news_task())  # 手动调用抓取任务
-        if isinstance(result, tuple):
-            return result  # 如果返回了元组 (response, status_code)，直接返回
-        return {"message": result}, 200  # 否则包装在 message 字段中
+        # 手动触发抓取，已有抓取在进行时复用该次抓取
+        run, started = crawl_coordinator.trigger(source='manual')
+
+        # wait=1 时等待抓取完成后返回结果
+        if request.args.get('wait', '0') in ('1', 'true'):
+            run.wait()
+            return run.result, 200 if run.status == 'succeeded' else 500
+
+        message = "抓取任务已启动" if started else "已有抓取任务在进行，已加入该任务"
+        return {"message": message, **run.to_dict()}, 202
     except Exception as e:
         app.logger.error(f"抓取新闻时出错: {e}")
         return {"error": f"抓取新闻时出错: {str(e)}"}, 500
 
+@app.route('/fetch_news/<run_id>', methods=['GET'])
+def get_fetch_news_run(run_id):
+    run = crawl_coordinator.get(run_id)
+    if not run:
+        return {"error": "抓取任务未找到"}, 404
+    return run.to_dict(), 200
+
 @app.route('/delete_news/<article_id>', methods=['DELETE'])
 def delete_news(article_id):
     try:
@@ -476,6 +1010,8 @@ def delete_news(article_id):
         if article:
             db.session.delete(article)
             db.session.commit()
+            recent_news_store.remove([article_id])
+            news_broadcaster.publish('delete', {'article_ids': [article_id]})
             return {"message": "文章已删除"}, 200
         else:
             return {"error": "文章未找到"}, 404
@@ -490,14 +1026,18 @@ def delete_news_batch():
         if not article_ids:
             return {"error": "未提供文章 ID 列表"}, 400
 
-        deleted_count = 0
+        deleted_ids = []
         for article_id in article_ids:
             article = FinanceNews.query.filter_by(article_id=article_id).first()
             if article:
                 db.session.delete(article)
-                deleted_count += 1
+                deleted_ids.append(article_id)
 
         db.session.commit()
+        deleted_count = len(deleted_ids)
+        recent_news_store.remove(deleted_ids)
+        if deleted_ids:
+            news_broadcaster.publish('delete', {'article_ids': deleted_ids})
         return {"message": f"已删除 {deleted_count} 篇文章"}, 200
     except Exception as e:
         app.logger.error(f"批量删除文章时出错: {e}")
@@ -523,41 +1063,28 @@ def analyze_24h_news():
         except json.JSONDecodeError:
             app.logger.warning(f"无法解析关注企业列表: {focused_companies}")
             focused_companies = []
+        # 获取分析模式：single 为单次调用，parallel 为按企业并行调用
+        analysis_mode = request.args.get('mode', default='single')
+        # 获取并行模式下的最大并发数，默认为4
+        max_workers = request.args.get('max_workers', type=int, default=4)
         
         # 计算指定时间前
         time_ago = datetime.utcnow() - timedelta(hours=hours)
         
-        # 获取指定时间范围内的新闻，按发布时间倒序排列
-        news_items = FinanceNews.query.filter(FinanceNews.created_at >= time_ago).order_by(FinanceNews.pub_time.desc()).all()
+        # 获取指定时间范围内的新闻，优先选择提及关注企业的文章，并限制数量避免输入过长
+        limited_news, relevant_count = select_news_for_analysis(time_ago, max_news, focused_companies)
         
-        if not news_items:
+        if not limited_news:
             return {"error": f"没有找到{hours}小时内的新闻"}, 404
         
-        # 限制新闻数量，避免输入过长
-        limited_news = news_items[:max_news]
-        app.logger.info(f"分析新闻: 最近{hours}小时内, 限制为最近{max_news}条, 实际选择{len(limited_news)}条")
-        
-        # 格式化新闻内容供分析
-        news_content = ""
-        for news in limited_news:
-            news_content += f"标题: {news.title}\n"
-            news_content += f"时间: {news.pub_time}\n"
-            news_content += f"类型: {news.article_type}\n"
-            if news.summary:
-                # 限制摘要长度
-                summary = news.summary[:summary_limit] + "..." if len(news.summary) > summary_limit else news.summary
-                news_content += f"摘要: {summary}\n"
-            news_content += "\n---\n\n"
-        
-        # 检查输入长度
-        if len(news_content) > 30000:  # 根据模型限制调整此值
-            app.logger.warning(f"新闻内容太长: {len(news_content)} 字符，将被截断")
-            news_content = news_content[:30000] + "...\n[内容已截断]"
+        app.logger.info(f"分析新闻: 最近{hours}小时内, 限制为最近{max_news}条, 实际选择{len(limited_news)}条, 其中提及关注企业{relevant_count}条")
         
         # 初始化AI服务并分析新闻
-        ai_service = DeepseekAI()
         try:
-            analysis_result = ai_service.analyze_news(news_content, focused_companies)
+            analysis_result = analyze_selected_news(
+                limited_news, focused_companies, summary_limit,
+                mode=analysis_mode, max_workers=max_workers
+            )
         except Exception as e:
             app.logger.error(f"AI分析失败: {str(e)}")
             return {"error": f"AI分析失败: {str(e)}"}, 500
@@ -604,6 +1131,7 @@ def analyze_24h_news():
         response_data = {
             "report_id": new_report.id,
             "news_count": len(limited_news),
+            "prompt_stats": analysis_result["prompt_stats"],
             "time_range": time_range,
             "reasoning": analysis_result["reasoning"],
             "analysis": analysis_result["analysis"]
@@ -619,6 +1147,109 @@ def analyze_24h_news():
         app.logger.error(f"分析新闻时出错: {e}")
         return {"error": f"分析新闻时出错: {str(e)}"}, 500
 
+def keyset_rows(query, key_column, cursor=0, batch_size=1000):
+    """
+    按主键分批读取导出数据，每批是一次独立的短查询
+
+    SQLite 在游标读取期间持有共享锁，整个导出共用一个游标会让抓取、删除等写操作
+    在导出期间一直等待，因此每读完一批就结束事务，下一批从上一批的最后一个主键继续
+    """
+    last_key = cursor
+    while True:
+        rows = query.filter(key_column > last_key).order_by(key_column).limit(batch_size).all()
+        db.session.rollback()  # 只读事务，释放连接和锁
+        if not rows:
+            return
+        yield from rows
+        last_key = getattr(rows[-1], key_column.key)
+
+def export_response(query, key_column, cursor, columns, name, transform=None):
+    """以流的形式导出查询结果，按主键分批读取，内存占用与行数无关"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return {"error": f"不支持的导出格式: {export_format}"}, 400
+    use_gzip = request.args.get('gzip', '0') in ('1', 'true')
+
+    rows = keyset_rows(query, key_column, cursor)
+    if transform:
+        rows = transform(rows)
+    chunks = encode_rows(rows, columns, export_format)
+    filename = f"{name}.{export_format}"
+    mimetype = EXPORT_FORMATS[export_format]
+    if use_gzip:
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@app.route('/export/news', methods=['GET'])
+def export_news():
+    try:
+        # 获取时间范围（按发布时间）、文章类型和续传游标（上次导出的最后一个 id）
+        start = parse_export_time(request.args.get('start'))
+        end = parse_export_time(request.args.get('end'), end=True)
+        article_type = request.args.get('article_type')
+        cursor = request.args.get('cursor', type=int, default=0)
+        include_content = request.args.get('include_content', '0') in ('1', 'true')
+    except ValueError as e:
+        return {"error": f"参数格式错误: {str(e)}"}, 400
+
+    columns = [
+        FinanceNews.id, FinanceNews.article_id, FinanceNews.title, FinanceNews.pub_time,
+        FinanceNews.created_at, FinanceNews.article_type, FinanceNews.url, NewsBody.codec, NewsBody.summary
+    ]
+    if include_content:
+        columns.append(NewsBody.content)
+
+    query = db.session.query(*columns).outerjoin(NewsBody)
+    if start:
+        query = query.filter(FinanceNews.pub_time >= start.strftime("%Y-%m-%d %H:%M:%S"))
+    if end:
+        query = query.filter(FinanceNews.pub_time <= end.strftime("%Y-%m-%d %H:%M:%S"))
+    if article_type:
+        query = query.filter(FinanceNews.article_type == article_type)
+
+    def decompress_bodies(rows):
+        # 正文压缩存储，逐行解压后输出
+        for row in rows:
+            codec = row[7] or DEFAULT_CODEC
+            yield row[:7] + tuple(decompress_text(blob, codec) for blob in row[8:])
+
+    names = ['id', 'article_id', 'title', 'pub_time', 'created_at', 'article_type', 'url', 'summary']
+    if include_content:
+        names.append('content')
+    return export_response(query, FinanceNews.id, cursor, names, 'news', transform=decompress_bodies)
+
+@app.route('/export/reports', methods=['GET'])
+def export_reports():
+    try:
+        # 获取时间范围（按生成时间）和续传游标
+        start = parse_export_time(request.args.get('start'))
+        end = parse_export_time(request.args.get('end'), end=True)
+        cursor = request.args.get('cursor', type=int, default=0)
+        include_content = request.args.get('include_content', '0') in ('1', 'true')
+    except ValueError as e:
+        return {"error": f"参数格式错误: {str(e)}"}, 400
+
+    columns = [
+        AnalysisReport.id, AnalysisReport.created_at, AnalysisReport.news_count, AnalysisReport.time_range,
+        AnalysisReport.news_impact, AnalysisReport.policy_impact, AnalysisReport.market_prediction,
+        AnalysisReport.focused_companies, AnalysisReport.company_predictions
+    ]
+    if include_content:
+        columns.extend([AnalysisReport.reasoning, AnalysisReport.analysis])
+
+    query = db.session.query(*columns)
+    if start:
+        query = query.filter(AnalysisReport.created_at >= start)
+    if end:
+        query = query.filter(AnalysisReport.created_at <= end)
+
+    return export_response(query, AnalysisReport.id, cursor, [column.key for column in columns], 'reports')
+
 @app.route('/reports', methods=['GET'])
 def get_reports():
     try:
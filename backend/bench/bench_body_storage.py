@@ -0,0 +1,152 @@
+"""
+Out-of-row body storage benchmark
+
+Builds a database with the pre-migration schema (summary and content inline
+in finance_news), measures file size and scan times, then starts the app on
+a copy so update_database_schema runs migrate_inline_news_bodies, and
+measures the same queries again.
+
+Run from the backend directory:
+    python bench/bench_body_storage.py [--rows 20000] [--keep DIR]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+WORDS = "央行 降准 市场 流动性 科技 板块 上涨 新能源 汽车 销量 政策 利好 半导体 芯片 出口 数据 增长 消费 复苏".split()
+
+# 迁移前 finance_news 的表结构，摘要和正文内联存放
+LEGACY_SCHEMA = """
+CREATE TABLE finance_news (
+    id INTEGER NOT NULL PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    link VARCHAR(200) NOT NULL,
+    article_id VARCHAR(50) NOT NULL UNIQUE,
+    created_at DATETIME,
+    pub_time VARCHAR(50) NOT NULL,
+    article_type VARCHAR(20) NOT NULL,
+    summary TEXT,
+    content TEXT,
+    url VARCHAR(200) NOT NULL
+)
+"""
+
+QUERIES = {
+    # 列表接口：时间窗口内按发布时间排序，只读取展示字段
+    'list scan': "SELECT id, title, pub_time, article_type FROM finance_news "
+                 "WHERE created_at >= '2026-10-15' ORDER BY pub_time DESC",
+    # 不走索引的全表扫描
+    'full scan': "SELECT count(*) FROM finance_news WHERE article_type = '电报'",
+}
+
+
+def build_legacy_db(path, rows, seed=1):
+    """与线上数据接近的分布：三分之一为带正文的长文，其余为只有摘要的电报"""
+    random.seed(seed)
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_SCHEMA)
+    batch = []
+    for i in range(rows):
+        long = i % 3 == 0
+        content = ''.join(random.choice(WORDS) for _ in range(1500)) if long else ''
+        summary = ''.join(random.choice(WORDS) for _ in range(40 if long else 120))
+        batch.append((
+            f"标题{i}", 'l', str(i), f"2026-10-{10 + i % 9:02d} 12:00:00",
+            f"2026-10-{10 + i % 9:02d} {i % 24:02d}:00:00", '长文' if long else '电报', summary, content, 'u'
+        ))
+    conn.executemany(
+        "INSERT INTO finance_news (title, link, article_id, created_at, pub_time, article_type, summary, content, url) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def measure(path, repeat=20):
+    conn = sqlite3.connect(path)
+    result = {'size MB': os.path.getsize(path) / 1e6}
+    for name, sql in QUERIES.items():
+        conn.execute(sql).fetchall()  # 预热页缓存
+        started = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(sql).fetchall()
+        result[f'{name} ms'] = (time.perf_counter() - started) / repeat * 1000
+    conn.close()
+    return result
+
+
+def table_sizes(path):
+    """各表及其索引占用的空间（MB），SQLite 未编译 dbstat 时返回空字典"""
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT coalesce(m.tbl_name, s.name), sum(s.pgsize) FROM dbstat s "
+            "LEFT JOIN sqlite_master m ON m.name = s.name GROUP BY 1 ORDER BY 2 DESC"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+    return {name: size / 1e6 for name, size in rows}
+
+
+def migrate(path):
+    """启动应用，导入时执行 update_database_schema 完成迁移"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ.setdefault('LKEAP_API_KEY', 'bench')
+    started = time.perf_counter()
+    import app as backend
+    elapsed = time.perf_counter() - started
+    backend.scheduler.shutdown(wait=False)
+    with backend.app.app_context():
+        backend.db.engine.dispose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--keep', help='Keep both databases in this directory')
+    args = parser.parse_args()
+
+    workdir = args.keep or tempfile.mkdtemp()
+    os.makedirs(workdir, exist_ok=True)
+    legacy_path = os.path.join(workdir, 'legacy.db')
+    migrated_path = os.path.join(workdir, 'migrated.db')
+    for path in (legacy_path, migrated_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    try:
+        build_legacy_db(legacy_path, args.rows)
+        shutil.copy(legacy_path, migrated_path)
+        before = measure(legacy_path)
+        startup = migrate(migrated_path)
+        after = measure(migrated_path)
+        sizes = table_sizes(migrated_path)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir)
+
+    print(f"{args.rows} articles, startup incl. migration and index backfill: {startup:.1f}s")
+    print(f"{'':>14} {'inline':>10} {'out of row':>11}")
+    for key in before:
+        print(f"{key:>14} {before[key]:>10.2f} {after[key]:>11.2f}")
+    if sizes:
+        # 迁移后的文件还包含启动时补建的 news_fragment 等派生表
+        print("size by table after migration (MB): " + ", ".join(
+            f"{name} {size:.2f}" for name, size in sizes.items() if size >= 0.01
+        ))
+
+
+if __name__ == '__main__':
+    main()
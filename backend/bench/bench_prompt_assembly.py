@@ -0,0 +1,86 @@
+"""
+Prompt assembly benchmark
+
+Compares the original per-request formatter (string += per field, then
+truncate) with joining fragments pre-rendered at ingest through
+prompt_builder.assemble_news_content, at 300, 3k and 30k candidates. Both
+must produce the same text.
+
+Run from the backend directory:
+    python bench/bench_prompt_assembly.py [--sizes 300 3000 30000] [--repeat 20]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_store import NewsRecord
+from prompt_builder import COMMON_SUMMARY_LIMITS, MAX_PROMPT_CHARS, render_fragments, assemble_news_content
+
+
+WORDS = "央行 降准 市场 流动性 科技 板块 上涨 新能源 汽车 销量 政策 利好 半导体 芯片 出口 数据 增长 消费 复苏".split()
+
+
+def legacy_format(news_items, summary_limit, max_length=MAX_PROMPT_CHARS):
+    """预渲染之前每次请求执行的格式化逻辑"""
+    news_content = ""
+    for news in news_items:
+        news_content += f"标题: {news.title}\n"
+        news_content += f"时间: {news.pub_time}\n"
+        news_content += f"类型: {news.article_type}\n"
+        if news.summary:
+            summary = news.summary[:summary_limit] + "..." if len(news.summary) > summary_limit else news.summary
+            news_content += f"摘要: {summary}\n"
+        news_content += "\n---\n\n"
+    if len(news_content) > max_length:
+        news_content = news_content[:max_length] + "...\n[内容已截断]"
+    return news_content
+
+
+def make_records(count, seed=1):
+    random.seed(seed)
+    records = []
+    for i in range(count):
+        title = f"标题{i} " + ''.join(random.choice(WORDS) for _ in range(8))
+        pub_time = f"2026-10-{10 + i % 9:02d} {i % 24:02d}:00:00"
+        article_type = '电报' if i % 3 else '长文'
+        summary = ''.join(random.choice(WORDS) for _ in range(random.randint(0, 120))) or None
+        records.append(NewsRecord(
+            i, str(i), title, pub_time, None, article_type, summary,
+            prompt_fragments=render_fragments(title, pub_time, article_type, summary)
+        ))
+    return records
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[300, 3000, 30000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--summary-limit', type=int, default=100, choices=COMMON_SUMMARY_LIMITS)
+    args = parser.parse_args()
+
+    print(f"{'candidates':>10} {'legacy ms':>10} {'fragments ms':>13} {'speedup':>8} {'items':>6} {'est. tokens':>12}")
+    for size in args.sizes:
+        records = make_records(size)
+        legacy_ms, legacy = timed(lambda: legacy_format(records, args.summary_limit), args.repeat)
+        new_ms, (content, stats) = timed(
+            lambda: assemble_news_content(record.prompt_fragments[args.summary_limit] for record in records),
+            args.repeat
+        )
+        assert content == legacy, '拼接结果与原格式不一致'
+        print(f"{size:>10} {legacy_ms:>10.2f} {new_ms:>13.2f} {legacy_ms / new_ms:>7.1f}x "
+              f"{stats['items']:>6} {stats['estimated_tokens']:>12}")
+
+
+if __name__ == '__main__':
+    main()
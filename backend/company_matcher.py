@@ -0,0 +1,175 @@
+import os
+import json
+import hashlib
+from collections import deque
+
+
+# 默认的企业词典：标准名称 -> 别名/股票代码
+DEFAULT_COMPANY_ALIASES = {
+    '腾讯': ['腾讯', '腾讯控股', 'Tencent', '00700', '0700.HK', 'TCEHY'],
+    '小米集团': ['小米集团', '小米', 'Xiaomi', '01810', '1810.HK'],
+    '中芯国际': ['中芯国际', 'SMIC', '00981', '688981'],
+    '特斯拉': ['特斯拉', 'Tesla', 'TSLA'],
+    '药明康德': ['药明康德', 'WuXi AppTec', '603259', '02359'],
+    '阿里巴巴': ['阿里巴巴', '阿里云', 'Alibaba', 'BABA', '09988'],
+}
+
+# 匹配规则变化时递增，使已有文章的企业索引在下次启动时重建
+MATCHER_VERSION = 2
+
+
+def load_company_aliases(path=None):
+    """
+    Load the company dictionary, merging an optional JSON file over the defaults
+
+    Args:
+        path (str, optional): JSON file of {"公司": ["别名", ...]}, defaults to
+            the COMPANY_ALIASES_FILE environment variable
+
+    Returns:
+        dict: Mapping of canonical company name to its aliases
+    """
+    aliases = {company: list(names) for company, names in DEFAULT_COMPANY_ALIASES.items()}
+
+    path = path or os.environ.get("COMPANY_ALIASES_FILE")
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            extra = json.load(f)
+        for company, names in extra.items():
+            if isinstance(names, str):
+                names = [names]
+            merged = aliases.setdefault(company, [company])
+            merged.extend(name for name in names if name not in merged)
+
+    return aliases
+
+
+def alias_fingerprint(aliases):
+    """
+    Fingerprint a company dictionary, used to detect when the index is stale
+
+    Args:
+        aliases (dict): Mapping of canonical company name to its aliases
+
+    Returns:
+        str: Hex digest that changes whenever a company, alias or the
+            matching rules change
+    """
+    normalized = sorted((company, sorted(set(names))) for company, names in aliases.items())
+    payload = json.dumps([MATCHER_VERSION, normalized], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _is_word_char(ch):
+    # 只对英文字母和数字做边界检查，中文别名不受影响
+    return ch.isascii() and ch.isalnum()
+
+
+class CompanyMatcher:
+    """Aho-Corasick matcher over company names, aliases and tickers"""
+
+    def __init__(self, aliases):
+        self.aliases = {}
+        # 每个节点: 子节点表、失败指针、命中的 (公司, 别名长度, 是否需要边界检查)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for company, names in aliases.items():
+            for name in {company, *names}:
+                self._add_pattern(name, company)
+        self._build()
+
+    def _add_pattern(self, name, company):
+        key = name.strip().lower()
+        if not key:
+            return
+        self.aliases[key] = company
+
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = nxt
+
+        needs_boundary = _is_word_char(key[0]) or _is_word_char(key[-1])
+        self._output[node].append((company, len(key), needs_boundary))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    @property
+    def companies(self):
+        return sorted(set(self.aliases.values()))
+
+    def canonical(self, name):
+        """
+        Resolve a company name, alias or ticker to its canonical name
+
+        Args:
+            name (str): Name as supplied by the user
+
+        Returns:
+            str: Canonical company name, or None if the name is unknown
+        """
+        if not name:
+            return None
+        return self.aliases.get(name.strip().lower())
+
+    def match(self, text):
+        """
+        Find all dictionary companies mentioned in a text in a single pass
+
+        Overlapping aliases are resolved leftmost-longest, so "腾讯控股" counts
+        as one mention of 腾讯 rather than two.
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            dict: Mapping of canonical company name to number of mentions
+        """
+        hits = {}
+        if not text:
+            return hits
+
+        lowered = text.lower()
+        candidates = []
+        node = 0
+        for i, ch in enumerate(lowered):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+
+            for company, length, needs_boundary in self._output[node]:
+                start = i - length + 1
+                if needs_boundary:
+                    if start > 0 and _is_word_char(lowered[start - 1]):
+                        continue
+                    if i + 1 < len(lowered) and _is_word_char(lowered[i + 1]):
+                        continue
+                candidates.append((start, -length, company))
+
+        # 同一位置取最长的别名，并跳过与已选匹配重叠的命中
+        end = 0
+        for start, negative_length, company in sorted(candidates):
+            if start < end:
+                continue
+            end = start - negative_length
+            hits[company] = hits.get(company, 0) + 1
+
+        return hits
@@ -0,0 +1,39 @@
+import zlib
+
+
+# 当前写入使用的压缩算法，读取时按记录上的 codec 解压
+DEFAULT_CODEC = 'zlib'
+
+
+def compress_text(text, level=6):
+    """
+    Compress a text field for out-of-row storage
+
+    Args:
+        text (str): Text to compress, None is kept as None
+        level (int): zlib compression level
+
+    Returns:
+        bytes: Compressed UTF-8 bytes
+    """
+    if text is None:
+        return None
+    return zlib.compress(text.encode('utf-8'), level)
+
+
+def decompress_text(blob, codec=DEFAULT_CODEC):
+    """
+    Decompress a text field written by compress_text
+
+    Args:
+        blob (bytes): Compressed bytes
+        codec (str): Codec recorded alongside the blob
+
+    Returns:
+        str: Original text, or None if the blob is empty
+    """
+    if blob is None:
+        return None
+    if codec == 'zlib':
+        return zlib.decompress(blob).decode('utf-8')
+    raise ValueError(f"未知的压缩格式: {codec}")
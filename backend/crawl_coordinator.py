@@ -0,0 +1,132 @@
+import uuid
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlRun:
+    """State of a single crawl, shared by every trigger attached to it"""
+
+    def __init__(self, source):
+        self.id = uuid.uuid4().hex
+        self.source = source
+        self.status = 'running'
+        self.triggers = 1
+        self.started_at = datetime.utcnow()
+        self.finished_at = None
+        self.processed = 0
+        self.total = 0
+        self.result = None
+        self._done = threading.Event()
+
+    def update_progress(self, processed, total):
+        self.processed = processed
+        self.total = total
+
+    def finish(self, result, status_code):
+        self.result = result
+        self.status = 'succeeded' if status_code < 400 else 'failed'
+        self.finished_at = datetime.utcnow()
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """Block until the crawl finishes, returns False on timeout"""
+        return self._done.wait(timeout)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def to_dict(self):
+        return {
+            "run_id": self.id,
+            "source": self.source,
+            "status": self.status,
+            "triggers": self.triggers,
+            "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "finished_at": self.finished_at.strftime("%Y-%m-%d %H:%M:%S") if self.finished_at else None,
+            "progress": round(self.processed / self.total * 100, 2) if self.total else 0,
+            "processed": self.processed,
+            "total": self.total,
+            "result": self.result,
+        }
+
+
+class CrawlCoordinator:
+    """
+    Single-flight coordinator for news crawls
+
+    One long-lived event loop thread owns all crawling. A trigger while a
+    crawl is in flight attaches to that run instead of starting another
+    one, so manual refreshes and the scheduled job never fetch the same
+    detail pages in parallel.
+    """
+
+    def __init__(self, crawl, history_size=20):
+        """
+        Args:
+            crawl (callable): Coroutine function taking a ``progress(processed, total)``
+                callback and returning ``(result, status_code)``
+            history_size (int): Number of finished runs kept for polling
+        """
+        self._crawl = crawl
+        self._history_size = history_size
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._current = None
+        self._runs = OrderedDict()
+
+    def trigger(self, source='manual'):
+        """
+        Start a crawl, or attach to the one already in flight
+
+        Args:
+            source (str): Who triggered the crawl, e.g. "manual" or "scheduler"
+
+        Returns:
+            tuple: (CrawlRun, started) where started is False if the caller
+                attached to an existing run
+        """
+        with self._lock:
+            if self._current is not None and not self._current.done:
+                self._current.triggers += 1
+                return self._current, False
+
+            self._ensure_loop()
+            run = CrawlRun(source)
+            self._current = run
+            self._runs[run.id] = run
+            while len(self._runs) > self._history_size:
+                self._runs.popitem(last=False)
+
+        asyncio.run_coroutine_threadsafe(self._execute(run), self._loop)
+        return run, True
+
+    def get(self, run_id):
+        with self._lock:
+            return self._runs.get(run_id)
+
+    @property
+    def current(self):
+        return self._current
+
+    def _ensure_loop(self):
+        if self._thread is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='crawl-coordinator', daemon=True)
+        self._thread.start()
+
+    async def _execute(self, run):
+        try:
+            result, status_code = await self._crawl(progress=run.update_progress)
+        except Exception as e:
+            logger.error(f"抓取任务 {run.id} 出错: {e}")
+            result, status_code = {"error": f"抓取新闻时出错: {str(e)}"}, 500
+        run.finish(result, status_code)
@@ -0,0 +1,94 @@
+import io
+import csv
+import json
+import zlib
+from datetime import datetime
+
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def parse_export_time(value, end=False):
+    """
+    Parse a start/end export parameter
+
+    Args:
+        value (str): "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS"
+        end (bool): For a date-only end bound, return the last second of
+            that day so the whole day is included
+
+    Returns:
+        datetime: Parsed bound, or None if the value is empty
+
+    Raises:
+        ValueError: If the value matches neither format
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        day = datetime.strptime(value, "%Y-%m-%d")
+        if end:
+            day = day.replace(hour=23, minute=59, second=59)
+        return day
+
+
+def _to_plain(value):
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def encode_rows(rows, columns, export_format='ndjson', batch_size=1000):
+    """
+    Encode rows as NDJSON or CSV text chunks, one chunk per batch of rows
+
+    Args:
+        rows (iterable): Row tuples in the order of ``columns``
+        columns (list): Column names
+        export_format (str): "ndjson" or "csv"
+        batch_size (int): Number of rows per yielded chunk
+
+    Yields:
+        str: Encoded text
+    """
+    buffer = io.StringIO()
+    writer = None
+    if export_format == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+
+    count = 0
+    for row in rows:
+        values = [_to_plain(value) for value in row]
+        if writer is not None:
+            writer.writerow([
+                json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+                for value in values
+            ])
+        else:
+            buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+            buffer.write('\n')
+
+        count += 1
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks, level=6):
+    """Incrementally gzip-compress text chunks"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 表示 gzip 格式
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,218 @@
+import sys
+import threading
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+
+def summary_preview(summary, limit=200):
+    """列表展示用的摘要预览，超出长度时截断"""
+    if summary and len(summary) > limit:
+        return summary[:limit] + '...'
+    return summary
+
+
+class NewsRecord:
+    """Compact, read-only copy of a FinanceNews row kept in the rolling store"""
+
+    __slots__ = ('id', 'article_id', 'title', 'pub_time', 'created_at',
+                 'article_type', 'summary', 'url', 'company_names', 'prompt_fragments')
+
+    def __init__(self, id, article_id, title, pub_time, created_at, article_type,
+                 summary=None, url=None, company_names=(), prompt_fragments=None):
+        self.id = id
+        self.article_id = article_id
+        self.title = title
+        self.pub_time = pub_time or ''
+        # 与数据库读出的值保持一致，统一去掉时区信息
+        self.created_at = created_at.replace(tzinfo=None) if created_at and created_at.tzinfo else created_at
+        self.article_type = article_type
+        self.summary = summary
+        self.url = url
+        self.company_names = tuple(company_names)
+        # 按摘要长度预渲染的提示词片段
+        self.prompt_fragments = prompt_fragments or {}
+
+    @property
+    def summary_preview(self):
+        return summary_preview(self.summary)
+
+    @property
+    def pub_key(self):
+        return (self.pub_time, self.id)
+
+    @property
+    def created_key(self):
+        return (self.created_at, self.id)
+
+    @property
+    def nbytes(self):
+        size = sys.getsizeof(self)
+        for name in self.__slots__:
+            size += sys.getsizeof(getattr(self, name))
+        size += sum(sys.getsizeof(name) for name in self.company_names)
+        size += sum(sys.getsizeof(fragment) for fragment in self.prompt_fragments.values())
+        return size
+
+    def __repr__(self):
+        return f'<NewsRecord {self.title}>'
+
+
+class RecentNewsStore:
+    """
+    Process-local rolling window of recent articles
+
+    Records are kept in two sorted arrays, one by pub_time and one by
+    created_at, so time windows are answered with binary search instead of
+    a database scan. ``complete_from`` tracks the created_at from which the
+    store is known to hold every stored article (None means all of them);
+    callers should fall back to the database for older windows.
+    """
+
+    def __init__(self, hours=120, max_items=20000):
+        self.hours = hours
+        self.max_items = max_items
+        self.complete_from = None
+        self.last_id = 0
+        self.warmed = False
+
+        self._lock = threading.RLock()
+        self._pub_keys = []
+        self._pub_records = []
+        self._created_keys = []
+        self._created_records = []
+        self._by_article_id = {}
+        self._nbytes = 0
+
+    def __len__(self):
+        return len(self._pub_records)
+
+    def load(self, records, complete_from=None):
+        """
+        Replace the store contents, e.g. when warming from the database
+
+        Args:
+            records (iterable): NewsRecord objects
+            complete_from (datetime, optional): Oldest created_at for which the
+                records are complete, None if they cover every stored article
+        """
+        with self._lock:
+            self._pub_keys, self._pub_records = [], []
+            self._created_keys, self._created_records = [], []
+            self._by_article_id = {}
+            self._nbytes = 0
+            self.complete_from = complete_from
+            self.last_id = 0
+
+            records = sorted(records, key=lambda record: record.pub_key)
+            for record in records:
+                self._by_article_id[record.article_id] = record
+                self._nbytes += record.nbytes
+                self.last_id = max(self.last_id, record.id or 0)
+            self._pub_keys = [record.pub_key for record in records]
+            self._pub_records = records
+            self._created_records = sorted(records, key=lambda record: record.created_key)
+            self._created_keys = [record.created_key for record in self._created_records]
+
+            self._evict_overflow()
+            self.warmed = True
+
+    def add(self, records):
+        """Add newly ingested records, replacing any with the same article_id"""
+        with self._lock:
+            for record in records:
+                if record.article_id in self._by_article_id:
+                    self._remove(self._by_article_id[record.article_id])
+
+                insort(self._pub_keys, record.pub_key)
+                self._pub_records.insert(bisect_left(self._pub_keys, record.pub_key), record)
+                insort(self._created_keys, record.created_key)
+                self._created_records.insert(bisect_left(self._created_keys, record.created_key), record)
+
+                self._by_article_id[record.article_id] = record
+                self._nbytes += record.nbytes
+                self.last_id = max(self.last_id, record.id or 0)
+
+            self._evict_overflow()
+
+    def remove(self, article_ids):
+        """Remove deleted articles, returns the number of records removed"""
+        removed = 0
+        with self._lock:
+            for article_id in article_ids:
+                record = self._by_article_id.get(article_id)
+                if record is not None:
+                    self._remove(record)
+                    removed += 1
+        return removed
+
+    def trim(self, cutoff):
+        """
+        Drop records created before ``cutoff``, called alongside retention
+
+        Once the database rows older than ``cutoff`` are deleted as well, the
+        store covers every remaining article again.
+        """
+        with self._lock:
+            index = bisect_left(self._created_keys, (cutoff,))
+            for record in self._created_records[:index]:
+                self._remove(record)
+            if self.complete_from is not None and self.complete_from <= cutoff:
+                self.complete_from = None
+            return index
+
+    def covers(self, cutoff=None):
+        """Whether every article with created_at >= ``cutoff`` is in the store"""
+        if not self.warmed:
+            return False
+        if self.complete_from is None:
+            return True
+        return cutoff is not None and cutoff >= self.complete_from
+
+    def since(self, cutoff):
+        """Records with created_at >= ``cutoff``, newest pub_time first"""
+        with self._lock:
+            index = bisect_left(self._created_keys, (cutoff,))
+            records = self._created_records[index:]
+        return sorted(records, key=lambda record: record.pub_key, reverse=True)
+
+    def latest(self, limit=None):
+        """All records ordered by pub_time, newest first"""
+        with self._lock:
+            records = self._pub_records[-limit:] if limit else list(self._pub_records)
+        records.reverse()
+        return records
+
+    def stats(self):
+        with self._lock:
+            return {
+                "count": len(self._pub_records),
+                "max_items": self.max_items,
+                "hours": self.hours,
+                "memory_bytes": self._nbytes,
+                "complete_from": self.complete_from.strftime("%Y-%m-%d %H:%M:%S") if self.complete_from else None,
+                "oldest_pub_time": self._pub_records[0].pub_time if self._pub_records else None,
+                "newest_pub_time": self._pub_records[-1].pub_time if self._pub_records else None,
+                "last_id": self.last_id,
+            }
+
+    def _remove(self, record):
+        index = bisect_left(self._pub_keys, record.pub_key)
+        del self._pub_keys[index]
+        del self._pub_records[index]
+        index = bisect_left(self._created_keys, record.created_key)
+        del self._created_keys[index]
+        del self._created_records[index]
+        del self._by_article_id[record.article_id]
+        self._nbytes -= record.nbytes
+
+    def _evict_overflow(self):
+        # 超出容量时淘汰入库最早的记录，并记录此后才保证完整
+        overflow = len(self._created_records) - self.max_items
+        if overflow <= 0:
+            return
+        evicted = self._created_records[:overflow]
+        for record in evicted:
+            self._remove(record)
+        boundary = evicted[-1].created_at + timedelta(microseconds=1)
+        if self.complete_from is None or boundary > self.complete_from:
+            self.complete_from = boundary
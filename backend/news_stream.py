@@ -0,0 +1,159 @@
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+
+from aiohttp import web
+
+
+logger = logging.getLogger(__name__)
+
+
+class NewsBroadcaster:
+    """
+    Server-Sent Events fan-out for newly ingested and deleted articles
+
+    Published events go into a shared ring buffer with increasing ids. All
+    stream connections are coroutines on a single event loop thread, each
+    keeping only a cursor into the buffer, so idle clients cost no thread
+    and a publish is O(1) regardless of how many clients are connected.
+    Clients resume with the ``Last-Event-ID`` header (or ``last_event_id``
+    query parameter); if their cursor has already left the buffer they get
+    a ``reset`` event and should reload the list.
+    """
+
+    def __init__(self, buffer_size=1000, heartbeat=15):
+        self.heartbeat = heartbeat
+        self._buffer = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        # 以启动时间的毫秒数作为起点，重启后事件 ID 仍然递增
+        self._last_id = int(time.time() * 1000)
+        self._loop = None
+        self._wakeup = None
+        self._thread = None
+        self._clients = 0
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    @property
+    def clients(self):
+        return self._clients
+
+    def publish(self, event_type, data):
+        """
+        Publish an event to every connected client, safe to call from any thread
+
+        Args:
+            event_type (str): SSE event name, e.g. "news" or "delete"
+            data (dict): JSON-serializable payload
+
+        Returns:
+            int: The event id
+        """
+        payload = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            self._last_id += 1
+            event_id = self._last_id
+            self._buffer.append((event_id, event_type, payload))
+
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._notify)
+        return event_id
+
+    def events_after(self, cursor):
+        """
+        Buffered events with id greater than ``cursor``
+
+        Returns:
+            tuple: (events, gap) where gap is True if events after the cursor
+                were already dropped from the buffer
+        """
+        with self._lock:
+            # 游标早于缓冲区（例如服务重启）或晚于最新事件时，都需要客户端重新加载
+            first_id = self._buffer[0][0] if self._buffer else self._last_id + 1
+            gap = cursor < first_id - 1 or cursor > self._last_id
+            return [event for event in self._buffer if event[0] > cursor], gap
+
+    def start(self, host='127.0.0.1', port=5001):
+        """
+        Start the stream server on its own event loop thread, only once
+
+        The stream is unauthenticated, so it listens on loopback unless a
+        public host is passed explicitly.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, args=(host, port), name='news-stream', daemon=True)
+        self._thread.start()
+
+    def _notify(self):
+        # 唤醒所有等待中的连接，并为下一轮等待准备新的 Event
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def _run(self, host, port):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._wakeup = asyncio.Event()
+
+        app = web.Application()
+        app.router.add_get('/news/stream', self.handle_stream)
+        runner = web.AppRunner(app)
+        try:
+            loop.run_until_complete(runner.setup())
+            loop.run_until_complete(web.TCPSite(runner, host, port).start())
+        except OSError as e:
+            logger.error(f"新闻推送服务启动失败: {e}")
+            return
+        self._loop = loop
+        logger.info(f"新闻推送服务已启动: {host}:{port}")
+        loop.run_forever()
+
+    async def handle_stream(self, request):
+        last_event_id = request.headers.get('Last-Event-ID') or request.query.get('last_event_id')
+        try:
+            cursor = int(last_event_id)
+        except (TypeError, ValueError):
+            cursor = self._last_id  # 新连接只接收之后的事件
+
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'Access-Control-Allow-Origin': '*',
+            'X-Accel-Buffering': 'no',
+        })
+        await response.prepare(request)
+        await response.write(f"retry: 3000\nid: {cursor}\n\n".encode('utf-8'))
+
+        self._clients += 1
+        try:
+            while True:
+                wakeup = self._wakeup
+                events, gap = self.events_after(cursor)
+                if gap:
+                    cursor = self._last_id
+                    await response.write(f"id: {cursor}\nevent: reset\ndata: {{}}\n\n".encode('utf-8'))
+                    continue
+                if events:
+                    chunk = ''.join(
+                        f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+                        for event_id, event_type, payload in events
+                    )
+                    cursor = events[-1][0]
+                    await response.write(chunk.encode('utf-8'))
+                    continue
+
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    await response.write(b": ping\n\n")
+        except ConnectionResetError:
+            pass
+        finally:
+            self._clients -= 1
+        return response
@@ -0,0 +1,90 @@
+import math
+
+
+# 入库时预先渲染的摘要长度，对应各分析入口的默认 summary_limit
+COMMON_SUMMARY_LIMITS = (100, 200)
+
+# 模型输入的最大字符数
+MAX_PROMPT_CHARS = 30000
+
+# 片段格式变化时递增，使已有文章的片段在下次启动时重新生成
+FRAGMENT_VERSION = 1
+
+
+def render_fragment(title, pub_time, article_type, summary, summary_limit):
+    """
+    Render the prompt fragment for one article
+
+    Args:
+        title (str): Article title
+        pub_time (str): Publish time
+        article_type (str): Article type
+        summary (str): Full summary, truncated to ``summary_limit``
+        summary_limit (int): Maximum summary length
+
+    Returns:
+        str: The article's block in the news section of a prompt
+    """
+    fragment = f"标题: {title}\n时间: {pub_time}\n类型: {article_type}\n"
+    if summary:
+        # 限制摘要长度
+        if len(summary) > summary_limit:
+            summary = summary[:summary_limit] + "..."
+        fragment += f"摘要: {summary}\n"
+    return fragment + "\n---\n\n"
+
+
+def render_fragments(title, pub_time, article_type, summary, limits=COMMON_SUMMARY_LIMITS):
+    """Render fragments for every common summary limit, keyed by limit"""
+    return {
+        limit: render_fragment(title, pub_time, article_type, summary, limit)
+        for limit in limits
+    }
+
+
+def fragment_fingerprint(limits=COMMON_SUMMARY_LIMITS):
+    """Identify the fragment format and limits, stored to detect stale fragments"""
+    return f"v{FRAGMENT_VERSION}:" + ",".join(str(limit) for limit in sorted(limits))
+
+
+def estimate_tokens(text):
+    """Rough token estimate: one token per CJK character, four ASCII characters per token"""
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    return (len(text) - ascii_chars) + math.ceil(ascii_chars / 4)
+
+
+def assemble_news_content(fragments, max_length=MAX_PROMPT_CHARS):
+    """
+    Join pre-rendered fragments into the news section of a prompt
+
+    Only the fragments that fit into ``max_length`` are joined, so the cost
+    does not grow with the number of candidates once the limit is reached.
+
+    Args:
+        fragments (iterable): Rendered fragments, in prompt order
+        max_length (int): Maximum number of characters before truncation
+
+    Returns:
+        tuple: (news_content, stats) where stats holds items, characters,
+            estimated_tokens and truncated
+    """
+    selected = []
+    length = 0
+    truncated = False
+    for fragment in fragments:
+        selected.append(fragment)
+        length += len(fragment)
+        if length > max_length:
+            truncated = True
+            break
+
+    news_content = ''.join(selected)
+    if truncated:
+        news_content = news_content[:max_length] + "...\n[内容已截断]"
+
+    return news_content, {
+        "items": len(selected),
+        "characters": len(news_content),
+        "estimated_tokens": estimate_tokens(news_content),
+        "truncated": truncated,
+    }
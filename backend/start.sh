@@ -96,6 +96,8 @@ if [ "$DEBUG" = true ]; then
   python app.py
 else
   echo "Running in PRODUCTION mode"
+  # 推送服务与 HTTP 服务监听相同的地址
+  export NEWS_STREAM_HOST="${NEWS_STREAM_HOST:-0.0.0.0}"
   # Use gunicorn if available, otherwise fall back to flask run
   if command -v gunicorn &> /dev/null; then
     gunicorn -b 0.0.0.0:$PORT app:app
@@ -0,0 +1,51 @@
+import json
+
+from company_matcher import DEFAULT_COMPANY_ALIASES, CompanyMatcher, alias_fingerprint, load_company_aliases
+
+
+matcher = CompanyMatcher(DEFAULT_COMPANY_ALIASES)
+
+
+def test_overlapping_aliases_count_once():
+    assert matcher.match('腾讯控股公告回购，小米集团发布新车') == {'腾讯': 1, '小米集团': 1}
+
+
+def test_separate_mentions_are_counted():
+    assert matcher.match('腾讯与腾讯控股、Tencent') == {'腾讯': 3}
+
+
+def test_ascii_aliases_need_word_boundaries():
+    assert matcher.match('ALIBABA 发布财报') == {'阿里巴巴': 1}  # 只命中 Alibaba，不再单独命中 BABA
+    assert matcher.match('BABA 盘前上涨') == {'阿里巴巴': 1}
+    assert matcher.match('TSLAX 与 Teslas') == {}
+    assert matcher.match('美股(TSLA)收跌') == {'特斯拉': 1}
+
+
+def test_numeric_tickers():
+    assert matcher.match('港股 00700 收涨') == {'腾讯': 1}
+    assert matcher.match('0700.HK 收涨') == {'腾讯': 1}
+    assert matcher.match('编号 1007000 与 007001') == {}
+    assert matcher.match('688981.SH 中芯国际') == {'中芯国际': 2}
+
+
+def test_chinese_aliases_match_inside_text():
+    assert matcher.match('消息称小米将发布') == {'小米集团': 1}
+
+
+def test_case_insensitive_and_canonical():
+    assert matcher.match('tesla 降价') == {'特斯拉': 1}
+    assert matcher.canonical(' tsla ') == '特斯拉'
+    assert matcher.canonical('阿里云') == '阿里巴巴'
+    assert matcher.canonical('未知公司') is None
+    assert matcher.match('') == {}
+
+
+def test_alias_file_extends_defaults(tmp_path):
+    path = tmp_path / 'aliases.json'
+    path.write_text(json.dumps({'宁德时代': ['CATL', '300750'], '腾讯': '鹅厂'}, ensure_ascii=False), encoding='utf-8')
+    aliases = load_company_aliases(str(path))
+
+    assert '鹅厂' in aliases['腾讯'] and 'Tencent' in aliases['腾讯']
+    assert CompanyMatcher(aliases).match('CATL 与鹅厂') == {'宁德时代': 1, '腾讯': 1}
+    assert alias_fingerprint(aliases) != alias_fingerprint(DEFAULT_COMPANY_ALIASES)
+    assert alias_fingerprint(load_company_aliases(str(path))) == alias_fingerprint(aliases)
@@ -0,0 +1,170 @@
+"""
+Streaming export memory test
+
+Seeds EXPORT_TEST_ROWS articles (default 100,000) into a temporary SQLite
+database, streams /export/news through the test client and asserts the
+traced Python memory peak stays under EXPORT_MEMORY_CEILING_MB, independent
+of the number of rows. The exported text is checked to be larger than the
+ceiling, so the assertion fails if the export is ever buffered.
+
+Run from the backend directory:
+    python -m pytest -q tests/test_export_memory.py
+    EXPORT_TEST_ROWS=1000000 python -m pytest -q tests/test_export_memory.py  # 约 10 分钟
+"""
+import os
+import csv
+import codecs
+import json
+import sqlite3
+import tempfile
+import tracemalloc
+import zlib
+
+import pytest
+
+
+ROWS = int(os.environ.get('EXPORT_TEST_ROWS', 100_000))
+MEMORY_CEILING_MB = float(os.environ.get('EXPORT_MEMORY_CEILING_MB', 20))
+
+
+@pytest.fixture(scope='module')
+def database():
+    tmpdir = tempfile.TemporaryDirectory()
+    path = os.path.join(tmpdir.name, 'export.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ.setdefault('LKEAP_API_KEY', 'test')
+
+    import app as backend  # 导入时按 DATABASE_URL 建表
+
+    # 停止定时抓取，避免测试期间写入真实新闻；也不启动推送服务
+    backend.scheduler.shutdown(wait=False)
+    backend.app.before_request_funcs[None].remove(backend.start_news_stream)
+
+    seed_news(path, ROWS)
+    yield backend, path
+
+    with backend.app.app_context():
+        backend.db.engine.dispose()
+    tmpdir.cleanup()
+
+
+@pytest.fixture(scope='module')
+def client(database):
+    backend, _ = database
+    return backend.app.test_client()
+
+
+def seed_news(path, rows, batch_size=50000):
+    """直接写入 SQLite，摘要按 compress_text 的格式压缩"""
+    from compression import compress_text
+
+    summary = compress_text('央行降准释放流动性，市场情绪回暖。' * 4)
+    conn = sqlite3.connect(path)
+    for start in range(1, rows + 1, batch_size):
+        ids = range(start, min(start + batch_size, rows + 1))
+        conn.executemany(
+            "INSERT INTO finance_news (id, title, link, article_id, created_at, pub_time, article_type, summary_preview, url) "
+            "VALUES (?, ?, 'l', ?, '2026-10-19 00:00:00', ?, ?, '', 'u')",
+            [(i, f'标题{i}', str(i), f'2026-10-{10 + i % 9:02d} 12:00:00', '电报' if i % 2 else '长文') for i in ids]
+        )
+        conn.executemany(
+            "INSERT INTO news_body (article_id, codec, summary, content) VALUES (?, 'zlib', ?, NULL)",
+            [(str(i), summary) for i in ids]
+        )
+    conn.commit()
+    conn.close()
+
+
+def stream_lines(response, stats=None):
+    """逐块解码响应，按行产出，不保留整个响应体；stats 累计解码后的字节数"""
+    decompressor = zlib.decompressobj(31) if response.mimetype == 'application/gzip' else None
+    decoder = codecs.getincrementaldecoder('utf-8')()  # 多字节字符可能跨块
+    pending = ''
+    for chunk in response.response:
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        if stats is not None:
+            stats['bytes'] = stats.get('bytes', 0) + len(chunk)
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        yield from lines
+    if pending:
+        yield pending
+
+
+def ndjson_ids(lines):
+    for line in lines:
+        yield json.loads(line)['id']
+
+
+def csv_ids(lines):
+    reader = csv.reader(lines)
+    assert next(reader)[0] == 'id'
+    for row in reader:
+        yield int(row[0])
+
+
+def check_contiguous(ids, first=1):
+    """检查 id 连续递增（无缺失、无重复），返回行数和最后一个 id"""
+    expected = first
+    for news_id in ids:
+        assert news_id == expected
+        expected += 1
+    return expected - first, expected - 1
+
+
+@pytest.mark.parametrize('query, parse_ids', [
+    ('format=ndjson', ndjson_ids),
+    ('format=csv', csv_ids),
+    ('format=ndjson&gzip=1', ndjson_ids),
+    ('format=csv&gzip=1', csv_ids),
+])
+def test_export_memory_ceiling(client, query, parse_ids):
+    stats = {}
+    tracemalloc.start()
+    try:
+        response = client.get(f'/export/news?{query}', buffered=False)
+        assert response.status_code == 200
+        count, last_id = check_contiguous(parse_ids(stream_lines(response, stats)))
+        response.close()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    ceiling = MEMORY_CEILING_MB * 1024 * 1024
+    assert (count, last_id) == (ROWS, ROWS)
+    assert stats['bytes'] > ceiling, 'EXPORT_TEST_ROWS 太小，导出内容未超过内存上限'
+    assert peak < ceiling, f'{query}: peak {peak / 1024 / 1024:.1f} MB'
+    print(f'{query}: {ROWS} rows, {stats["bytes"] / 1024 / 1024:.1f} MB exported, traced peak {peak / 1024 / 1024:.1f} MB')
+
+
+def test_export_cursor_resume(client):
+    # 读取一部分后中断，再用最后一个 id 作为 cursor 续传
+    response = client.get('/export/news?format=ndjson', buffered=False)
+    lines = stream_lines(response)
+    cursor = 0
+    for _ in range(min(ROWS // 3, 25000)):
+        cursor = json.loads(next(lines))['id']
+    response.close()
+
+    response = client.get(f'/export/news?format=ndjson&cursor={cursor}', buffered=False)
+    count, last_id = check_contiguous(ndjson_ids(stream_lines(response)), first=cursor + 1)
+    response.close()
+    assert cursor + count == ROWS and last_id == ROWS
+
+
+
+def test_export_does_not_block_writers(client, database):
+    # 导出读完第一块后暂停，此时其他连接的写入不应因数据库被锁而失败
+    _, path = database
+    response = client.get('/export/news?format=ndjson', buffered=False)
+    chunks = iter(response.response)
+    next(chunks)
+
+    conn = sqlite3.connect(path, timeout=0)
+    try:
+        conn.execute("UPDATE finance_news SET url = url WHERE id = 1")
+        conn.commit()
+    finally:
+        conn.close()
+        response.close()
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from news_store import NewsRecord, RecentNewsStore
+
+
+BASE = datetime(2026, 10, 19, 8, 0, 0)
+
+
+def record(news_id, hours=0, pub_time=None, article_id=None):
+    """入库时间为 BASE 之后 ``hours`` 小时的记录，默认发布时间与入库时间一致"""
+    created_at = BASE + timedelta(hours=hours)
+    return NewsRecord(
+        news_id, article_id or str(news_id), f'标题{news_id}',
+        pub_time or created_at.strftime("%Y-%m-%d %H:%M:%S"), created_at, '电报', '摘要'
+    )
+
+
+def ids(records):
+    return [item.id for item in records]
+
+
+def test_since_and_latest_order_by_pub_time():
+    store = RecentNewsStore()
+    # 入库顺序与发布时间顺序不同
+    store.load([record(1, 0, '2026-10-19 09:00:00'), record(2, 1, '2026-10-19 07:00:00'), record(3, 2, '2026-10-19 08:00:00')])
+
+    assert ids(store.latest()) == [1, 3, 2]
+    assert ids(store.latest(limit=2)) == [1, 3]
+    assert ids(store.since(BASE + timedelta(hours=1))) == [3, 2]
+    assert ids(store.since(BASE + timedelta(hours=3))) == []
+
+
+def test_add_keeps_arrays_sorted_and_replaces_same_article():
+    store = RecentNewsStore()
+    store.load([record(1, 0), record(3, 2)])
+    store.add([record(2, 1), record(4, 3, article_id='1')])
+
+    assert ids(store.latest()) == [4, 3, 2]
+    assert ids(store.since(BASE)) == [4, 3, 2]
+    assert store.last_id == 4
+    assert len(store) == 3
+
+
+def test_remove():
+    store = RecentNewsStore()
+    store.load([record(1, 0), record(2, 1), record(3, 2)])
+
+    assert store.remove(['2', 'missing']) == 1
+    assert ids(store.latest()) == [3, 1]
+    assert ids(store.since(BASE)) == [3, 1]
+    assert store.stats()['memory_bytes'] == sum(item.nbytes for item in store.latest())
+
+
+def test_overflow_evicts_oldest_and_marks_incomplete():
+    store = RecentNewsStore(max_items=3)
+    store.load([record(i, i) for i in range(1, 4)])
+    assert store.complete_from is None and store.covers()
+
+    store.add([record(4, 4), record(5, 5)])
+    assert ids(store.latest()) == [5, 4, 3]
+    # 被淘汰的最新记录之后才保证完整
+    assert store.complete_from == BASE + timedelta(hours=2, microseconds=1)
+    assert not store.covers()
+    assert not store.covers(BASE + timedelta(hours=2))
+    assert store.covers(BASE + timedelta(hours=3))
+
+
+def test_load_with_older_rows_in_database():
+    store = RecentNewsStore()
+    assert not store.covers()  # 预热之前一律回退到数据库
+
+    cutoff = BASE + timedelta(hours=1)
+    store.load([record(2, 1), record(3, 2)], complete_from=cutoff)
+    assert store.covers(cutoff)
+    assert store.covers(cutoff + timedelta(hours=1))
+    assert not store.covers(cutoff - timedelta(seconds=1))
+    assert not store.covers()
+
+
+def test_trim_drops_old_records_and_restores_full_coverage():
+    store = RecentNewsStore()
+    store.load([record(i, i) for i in range(1, 5)], complete_from=BASE + timedelta(hours=1))
+
+    assert store.trim(BASE + timedelta(hours=3)) == 2
+    assert ids(store.latest()) == [4, 3]
+    # 数据库中更早的文章也被清理，窗口重新覆盖全部数据
+    assert store.complete_from is None and store.covers()
+
+
+def test_trim_before_complete_from_keeps_it():
+    store = RecentNewsStore()
+    complete_from = BASE + timedelta(hours=3)
+    store.load([record(i, i) for i in range(3, 6)], complete_from=complete_from)
+
+    store.trim(BASE + timedelta(hours=1))
+    assert store.complete_from == complete_from
+    assert len(store) == 3
@@ -0,0 +1,131 @@
+"""
+SSE fan-out load test
+
+Starts a NewsBroadcaster on a free local port, connects SSE_SWARM_CLIENTS
+aiohttp clients (default 500), publishes a few events and checks that every
+client receives every event id without the server growing any threads, plus
+the Last-Event-ID resume and ``reset`` gap paths.
+
+Run from the backend directory:
+    python -m pytest -q tests/test_news_stream.py
+"""
+import os
+import time
+import socket
+import asyncio
+import threading
+
+import aiohttp
+import pytest
+
+from news_stream import NewsBroadcaster
+
+
+CLIENTS = int(os.environ.get('SSE_SWARM_CLIENTS', 500))
+EVENTS = 3
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_broadcaster(**kwargs):
+    broadcaster = NewsBroadcaster(**kwargs)
+    port = free_port()
+    broadcaster.start(host='127.0.0.1', port=port)
+    deadline = time.time() + 5
+    while broadcaster._loop is None:
+        assert time.time() < deadline, '推送服务未能启动'
+        time.sleep(0.01)
+    return broadcaster, f'http://127.0.0.1:{port}/news/stream'
+
+
+async def read_events(response, count):
+    """读取 ``count`` 个事件，返回 (id, event) 列表，跳过 retry 和心跳"""
+    events = []
+    event_id = event_type = None
+    async for raw in response.content:
+        line = raw.decode('utf-8').rstrip('\n')
+        if line.startswith('id: '):
+            event_id = int(line[4:])
+        elif line.startswith('event: '):
+            event_type = line[7:]
+        elif line == '' and event_type:
+            events.append((event_id, event_type))
+            event_type = None
+            if len(events) == count:
+                break
+    return events
+
+
+async def wait_for_clients(broadcaster, count, timeout=30):
+    deadline = time.time() + timeout
+    while broadcaster.clients < count:
+        assert time.time() < deadline, f'只连接了 {broadcaster.clients}/{count} 个客户端'
+        await asyncio.sleep(0.05)
+
+
+def test_swarm_receives_every_event():
+    broadcaster, url = start_broadcaster()
+
+    async def client(session, received):
+        async with session.get(url) as response:
+            received.append(await read_events(response, EVENTS))
+
+    async def main():
+        received = []
+        connector = aiohttp.TCPConnector(limit=0)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60)) as session:
+            # 先连接一个客户端，让服务端完成所有惰性初始化再记录线程数
+            warmup = asyncio.create_task(client(session, received))
+            await wait_for_clients(broadcaster, 1)
+            threads = threading.active_count()
+
+            tasks = [asyncio.create_task(client(session, received)) for _ in range(CLIENTS)]
+            await wait_for_clients(broadcaster, CLIENTS + 1)
+            assert threading.active_count() == threads
+
+            started = time.perf_counter()
+            ids = [broadcaster.publish('news', {'article_id': str(i)}) for i in range(EVENTS)]
+            await asyncio.gather(warmup, *tasks)
+            elapsed = time.perf_counter() - started
+
+            assert threading.active_count() == threads
+        return received, ids, elapsed
+
+    received, ids, elapsed = asyncio.run(main())
+    assert len(received) == CLIENTS + 1
+    assert all(events == [(event_id, 'news') for event_id in ids] for events in received)
+    print(f'{CLIENTS + 1} clients received {EVENTS} events in {elapsed:.3f}s')
+
+
+def test_resume_from_last_event_id():
+    broadcaster, url = start_broadcaster()
+    ids = [broadcaster.publish('news', {'article_id': str(i)}) for i in range(5)]
+
+    async def main():
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, headers={'Last-Event-ID': str(ids[1])}) as response:
+                return await read_events(response, 3)
+
+    assert asyncio.run(main()) == [(event_id, 'news') for event_id in ids[2:]]
+
+
+@pytest.mark.parametrize('cursor', ['dropped', 'future'])
+def test_reset_when_cursor_outside_buffer(cursor):
+    broadcaster, url = start_broadcaster(buffer_size=5)
+    ids = [broadcaster.publish('news', {'article_id': str(i)}) for i in range(10)]
+    last_event_id = ids[0] if cursor == 'dropped' else ids[-1] + 100
+
+    async def main():
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, headers={'Last-Event-ID': str(last_event_id)}) as response:
+                events = await read_events(response, 1)
+                # reset 之后从最新位置继续接收
+                next_id = broadcaster.publish('delete', {'article_ids': ['0']})
+                return events + await read_events(response, 1), next_id
+
+    events, next_id = asyncio.run(main())
+    assert events == [(ids[-1], 'reset'), (next_id, 'delete')]
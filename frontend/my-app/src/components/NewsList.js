@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 import { Container, Card, Badge, Row, Col, Spinner, Alert, Form, Button, Pagination, InputGroup } from 'react-bootstrap';
 import Logo from './Logo';
@@ -52,6 +52,58 @@ function NewsList() {
     }
   }, [sortBy, order, searchTerm]); // 只在排序、顺序或搜索词改变时重新获取
 
+  // 订阅新闻推送，代替轮询整个新闻列表
+  const sortRef = useRef({ sortBy, order });
+  sortRef.current = { sortBy, order };
+  const fetchNewsRef = useRef(null);
+
+  useEffect(() => {
+    if (!window.EventSource) {
+      return undefined;
+    }
+    const source = new EventSource(`${API_URL}/news/stream`);
+
+    source.addEventListener('news', (e) => {
+      const article = JSON.parse(e.data);
+      setCachedNews(prev => {
+        if (!prev) {
+          return prev;
+        }
+        const { sortBy: field, order: direction } = sortRef.current;
+        const merged = [article, ...prev.filter(item => item.article_id !== article.article_id)];
+        merged.sort((a, b) => {
+          const result = String(a[field] ?? '').localeCompare(String(b[field] ?? ''));
+          return direction === 'asc' ? result : -result;
+        });
+        return merged;
+      });
+    });
+
+    source.addEventListener('delete', (e) => {
+      const { article_ids: articleIds } = JSON.parse(e.data);
+      setCachedNews(prev => prev ? prev.filter(item => !articleIds.includes(item.article_id)) : prev);
+    });
+
+    // 断线太久错过了事件，重新加载列表
+    source.addEventListener('reset', () => {
+      if (fetchNewsRef.current) {
+        fetchNewsRef.current(true);
+      }
+    });
+
+    return () => source.close();
+  }, []);
+
+  // 推送更新缓存后刷新当前页
+  useEffect(() => {
+    if (cachedNews && !searchTerm) {
+      const startIndex = (currentPage - 1) * pageSize;
+      const endIndex = Math.min(startIndex + pageSize, cachedNews.length);
+      setNews(cachedNews.slice(startIndex, endIndex));
+      setTotalItems(cachedNews.length);
+    }
+  }, [cachedNews]);
+
   const fetchNews = async (forceRefresh = false) => {
     const startTime = Date.now();
     console.log('开始获取新闻数据...');
@@ -150,6 +202,8 @@ function NewsList() {
     }
   };
 
+  fetchNewsRef.current = fetchNews;
+
   // 处理页码变化
   const handlePageChange = (page) => {
     setCurrentPage(page);
@@ -211,19 +265,29 @@ function NewsList() {
       console.log('收到抓取响应，耗时:', Date.now() - requestStartTime, 'ms');
       console.log('响应数据:', response.data);
       
-      if (response.data.message) {
-        alert(response.data.message);
+      // 抓取在后台执行，轮询任务状态直到完成
+      let run = response.data;
+      const pollDeadline = Date.now() + 5 * 60 * 1000;
+      while (run.run_id && run.status === 'running' && Date.now() < pollDeadline) {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        const pollResponse = await axios.get(`${API_URL}/fetch_news/${run.run_id}`, { timeout: 10000 });
+        run = pollResponse.data;
+        console.log('抓取进度:', run.progress, '%');
+      }
+      
+      if (run.result?.message) {
+        alert(run.result.message);
+      } else if (run.result?.error) {
+        alert(run.result.error);
       } else {
-        alert('抓取任务已启动！');
+        alert(run.message || '抓取任务已启动！');
       }
       
       console.log('准备刷新新闻列表...');
-      setTimeout(() => {
-        fetchNews(true).catch(err => {
-          console.error('刷新新闻列表失败:', err);
-          setError('刷新新闻列表失败，请稍后重试');
-        });
-      }, 3000);
+      fetchNews(true).catch(err => {
+        console.error('刷新新闻列表失败:', err);
+        setError('刷新新闻列表失败，请稍后重试');
+      });
     } catch (err) {
       console.error('触发新闻抓取失败:', err);
       console.error('错误详情:', {